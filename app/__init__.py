@@ -13,6 +13,8 @@ from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.engine import make_url
 from sqlalchemy.exc import ArgumentError
 
+from .caching import init_caching
+
 # Initialize extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
@@ -77,6 +79,12 @@ def create_app(test_config: dict | None = None) -> Flask:
         "SQLALCHEMY_DATABASE_URI": _normalize_database_uri(os.getenv("DATABASE_URL")),
         "SQLALCHEMY_TRACK_MODIFICATIONS": False,
         "SQLALCHEMY_ENGINE_OPTIONS": {"pool_pre_ping": True},
+        "TEMPLATE_BYTECODE_CACHE_DIR": os.getenv("FINANCE_APP_TEMPLATE_CACHE_DIR"),
+        "FRAGMENT_CACHE_SIZE": 256,
+        "COMPRESSION_MIN_SIZE": 500,
+        "COMPRESSION_LEVEL": 6,
+        "STATIC_MAX_AGE": 31_536_000,
+        "RECURRING_INTERVAL": 3600,
     }
 
     if test_config:
@@ -88,6 +96,7 @@ def create_app(test_config: dict | None = None) -> Flask:
     app.config.update(config)
 
     db.init_app(app)
+    init_caching(app)
     login_manager.init_app(app)
     login_manager.login_view = "auth.login"
     login_manager.login_message = "กรุณาเข้าสู่ระบบก่อนใช้งาน"
@@ -103,8 +112,17 @@ def create_app(test_config: dict | None = None) -> Flask:
             return db.session.get(User, int(user_id))
         return None
 
+    from .recurring import init_recurring
+    from .search import init_search
+
     with app.app_context():
         db.create_all()
+        # create_all() skips indexes of tables that already exist.
+        for index in db.metadata.tables["finance_records"].indexes:
+            index.create(db.engine, checkfirst=True)
+        init_search(app)
+
+    init_recurring(app)
 
     from .auth import auth_bp
     from .views import views_bp
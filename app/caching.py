@@ -0,0 +1,171 @@
+"""Template, fragment, and HTTP response caching for the finance app."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+from typing import Final, Hashable
+
+from flask import Flask, Response, current_app, request
+from jinja2 import FileSystemBytecodeCache
+
+try:
+    import brotli  # type: ignore[import]
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    brotli = None
+
+_COMPRESSIBLE_MIMETYPES: Final[frozenset[str]] = frozenset(
+    {"text/html", "text/css", "text/plain", "application/json", "application/javascript"}
+)
+_FINGERPRINT_ARG: Final[str] = "v"
+
+
+class FragmentCache:
+    """Thread-safe LRU cache of rendered template fragments.
+
+    Each entry is stored under a *key* together with a *version*; a lookup
+    with a different version counts as a miss so stale fragments are never
+    served and are replaced on the next :meth:`set`.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self._max_entries = max(1, max_entries)
+        self._entries: OrderedDict[Hashable, tuple[Hashable, object]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, version: Hashable) -> object | None:
+        """Return the fragment cached for *key* at *version*, if any."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, version: Hashable, fragment: object) -> None:
+        """Store *fragment* for *key* at *version*, evicting old entries."""
+
+        with self._lock:
+            self._entries[key] = (version, fragment)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached fragment."""
+
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache(maxsize=128)
+def _hash_static_file(path: str, mtime_ns: int) -> str:
+    """Return a short content hash for the static file at *path*."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def static_fingerprint(filename: str) -> str | None:
+    """Return the fingerprint for static *filename* or None when missing."""
+
+    static_folder = current_app.static_folder
+    if not static_folder:
+        return None
+
+    path = os.path.join(static_folder, filename)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    return _hash_static_file(path, mtime_ns)
+
+
+def _add_static_fingerprint(endpoint: str, values: dict) -> None:
+    """Append a content fingerprint to ``url_for('static', ...)`` URLs."""
+
+    if endpoint != "static" or _FINGERPRINT_ARG in values:
+        return
+
+    filename = values.get("filename")
+    if not filename:
+        return
+
+    fingerprint = static_fingerprint(filename)
+    if fingerprint:
+        values[_FINGERPRINT_ARG] = fingerprint
+
+
+def _choose_encoding() -> str | None:
+    """Return the best response encoding accepted by the client."""
+
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered)
+
+
+def _compress_response(response: Response) -> None:
+    """Compress eligible response bodies in place."""
+
+    if response.status_code != 200 or response.mimetype not in _COMPRESSIBLE_MIMETYPES:
+        return
+
+    # Every variant of a compressible URL must carry Vary, compressed or not.
+    response.vary.add("Accept-Encoding")
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+    ):
+        return
+
+    data = response.get_data()
+    if len(data) < current_app.config["COMPRESSION_MIN_SIZE"]:
+        return
+
+    encoding = _choose_encoding()
+    if encoding == "br":
+        compressed = brotli.compress(data)
+    elif encoding == "gzip":
+        compressed = gzip.compress(data, compresslevel=current_app.config["COMPRESSION_LEVEL"])
+    else:
+        return
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+
+
+def _apply_response_caching(response: Response) -> Response:
+    """Set long-lived headers on fingerprinted assets and compress bodies."""
+
+    if (
+        request.endpoint == "static"
+        and request.args.get(_FINGERPRINT_ARG)
+        and response.status_code in (200, 304)
+    ):
+        # Flask marks static files no-cache by default; replace, don't append.
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config["STATIC_MAX_AGE"]
+        response.cache_control.immutable = True
+
+    _compress_response(response)
+    return response
+
+
+def init_caching(app: Flask) -> None:
+    """Configure template bytecode caching, fragment caching, and headers."""
+
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(
+        app.config.get("TEMPLATE_BYTECODE_CACHE_DIR") or None
+    )
+    app.extensions["fragment_cache"] = FragmentCache(app.config["FRAGMENT_CACHE_SIZE"])
+    app.url_defaults(_add_static_fingerprint)
+    app.after_request(_apply_response_caching)
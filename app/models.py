@@ -5,7 +5,7 @@ from decimal import Decimal
 
 from flask_login import UserMixin
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, Date, Numeric, ForeignKey, Text, DateTime
+from sqlalchemy import Integer, String, Date, Numeric, ForeignKey, Text, DateTime, Index
 
 from . import db
 
@@ -25,6 +25,9 @@ class User(UserMixin, db.Model):
     records: Mapped[list["FinanceRecord"]] = relationship(
         back_populates="user", cascade="all, delete-orphan"
     )
+    recurring_rules: Mapped[list["RecurringRule"]] = relationship(
+        back_populates="user", cascade="all, delete-orphan"
+    )
 
     def __repr__(self) -> str:  # pragma: no cover - representation helper
         return f"<User {self.username!r}>"
@@ -34,6 +37,10 @@ class FinanceRecord(db.Model):
     """Financial record stored for each user."""
 
     __tablename__ = "finance_records"
+    __table_args__ = (
+        # Serves per-user listings, date filters and the dashboard version check.
+        Index("ix_finance_records_user_date", "user_id", "record_date", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -50,3 +57,31 @@ class FinanceRecord(db.Model):
 
     def __repr__(self) -> str:  # pragma: no cover - representation helper
         return f"<FinanceRecord {self.category!r} {self.amount}>"
+
+
+class RecurringRule(db.Model):
+    """Schedule that materialises a finance record on a repeating date."""
+
+    __tablename__ = "recurring_rules"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    record_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    category: Mapped[str] = mapped_column(String(120), nullable=False)
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    frequency: Mapped[str] = mapped_column(String(20), nullable=False)
+    interval: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    day_of_month: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    start_date: Mapped[date] = mapped_column(Date, nullable=False)
+    end_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    # Next date still to be materialised; NULL once the rule has finished.
+    next_occurrence: Mapped[date | None] = mapped_column(Date, nullable=True, index=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    user: Mapped[User] = relationship(back_populates="recurring_rules")
+
+    def __repr__(self) -> str:  # pragma: no cover - representation helper
+        return f"<RecurringRule {self.category!r} {self.frequency}>"
@@ -0,0 +1,204 @@
+"""Recurring transaction rules and their batched materialisation."""
+
+from __future__ import annotations
+
+import calendar
+import threading
+from datetime import date, timedelta
+from typing import Final
+
+import click
+from flask import Flask
+from flask.cli import with_appcontext
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from . import db
+from .models import FinanceRecord, RecurringRule
+
+FREQUENCIES: Final[frozenset[str]] = frozenset({"weekly", "monthly"})
+DEFAULT_BATCH_SIZE: Final[int] = 500
+MAX_INTERVAL: Final[int] = 120
+
+
+def _add_months(value: date, months: int, day_of_month: int) -> date:
+    """Return *value* shifted by *months*, clamping *day_of_month* to the month."""
+
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    last_day = calendar.monthrange(year, month)[1]
+    return date(year, month, min(day_of_month, last_day))
+
+
+def first_occurrence(start_date: date, frequency: str, day_of_month: int | None) -> date:
+    """Return the first date on or after *start_date* that a rule fires."""
+
+    if frequency != "monthly" or day_of_month is None:
+        return start_date
+
+    candidate = _add_months(start_date, 0, day_of_month)
+    if candidate < start_date:
+        candidate = _add_months(start_date, 1, day_of_month)
+    return candidate
+
+
+def next_occurrence_after(rule: RecurringRule, current: date) -> date:
+    """Return the occurrence of *rule* that follows *current*."""
+
+    if rule.frequency == "weekly":
+        return current + timedelta(weeks=rule.interval)
+    return _add_months(current, rule.interval, rule.day_of_month or rule.start_date.day)
+
+
+def due_occurrences(rule: RecurringRule, until: date) -> tuple[list[date], date | None]:
+    """Return the dates of *rule* due up to *until* and the next pending date.
+
+    A next date past ``date.max`` finishes the rule instead of raising, so one
+    bad rule can never block materialisation for everyone else.
+    """
+
+    last_date = until if rule.end_date is None else min(until, rule.end_date)
+    dates: list[date] = []
+    current = rule.next_occurrence
+    while current is not None and current <= last_date:
+        dates.append(current)
+        try:
+            current = next_occurrence_after(rule, current)
+        except (ValueError, OverflowError):
+            current = None
+
+    if current is not None and rule.end_date is not None and current > rule.end_date:
+        current = None
+    return dates, current
+
+
+def materialize_due_records(
+    until: date | None = None,
+    *,
+    user_id: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Insert every record due on or before *until* and return how many.
+
+    Rules are processed in batches of *batch_size*, each committed as a single
+    transaction holding one bulk insert. Advancing ``next_occurrence`` is a
+    compare-and-set on its previous value, so a rule already handled by a
+    concurrent run is skipped and re-running never duplicates records.
+    """
+
+    until = until or date.today()
+    created = 0
+    last_id = 0
+
+    while True:
+        stmt = (
+            select(RecurringRule)
+            .where(
+                RecurringRule.id > last_id,
+                RecurringRule.next_occurrence.is_not(None),
+                RecurringRule.next_occurrence <= until,
+            )
+            .order_by(RecurringRule.id)
+            .limit(batch_size)
+        )
+        if user_id is not None:
+            stmt = stmt.where(RecurringRule.user_id == user_id)
+
+        rules = list(db.session.scalars(stmt))
+        if not rules:
+            break
+        last_id = rules[-1].id
+
+        rows: list[dict[str, object]] = []
+        try:
+            for rule in rules:
+                dates, pending = due_occurrences(rule, until)
+                claimed = db.session.execute(
+                    update(RecurringRule)
+                    .where(
+                        RecurringRule.id == rule.id,
+                        RecurringRule.next_occurrence == rule.next_occurrence,
+                    )
+                    .values(next_occurrence=pending)
+                    .execution_options(synchronize_session=False)
+                )
+                if claimed.rowcount != 1:
+                    continue
+                rows.extend(
+                    {
+                        "user_id": rule.user_id,
+                        "record_date": occurrence,
+                        "record_type": rule.record_type,
+                        "category": rule.category,
+                        "description": rule.description,
+                        "amount": rule.amount,
+                    }
+                    for occurrence in dates
+                )
+
+            if rows:
+                db.session.execute(insert(FinanceRecord), rows)
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            raise
+
+        created += len(rows)
+
+    return created
+
+
+class RecurringScheduler(threading.Thread):
+    """Daemon thread that materialises due records on a fixed interval."""
+
+    def __init__(self, app: Flask, interval: float) -> None:
+        super().__init__(name="recurring-scheduler", daemon=True)
+        self._app = app
+        self._interval = interval
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        """Materialise due records immediately, then every *interval* seconds."""
+
+        while not self._stopped.is_set():
+            with self._app.app_context():
+                try:
+                    created = materialize_due_records()
+                except Exception:  # keep the scheduler alive for the next run
+                    db.session.rollback()
+                    self._app.logger.exception("Failed to materialise recurring records")
+                else:
+                    if created:
+                        self._app.logger.info("Materialised %d recurring records", created)
+                finally:
+                    db.session.remove()
+            self._stopped.wait(self._interval)
+
+    def stop(self) -> None:
+        """Ask the scheduler to exit after the current run."""
+
+        self._stopped.set()
+
+
+@click.command("materialize-recurring")
+@click.option(
+    "--until",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Materialise occurrences up to this date (default: today).",
+)
+@click.option("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, show_default=True)
+@with_appcontext
+def materialize_recurring_command(until, batch_size: int) -> None:
+    """Create finance records for every recurring rule that is due."""
+
+    created = materialize_due_records(
+        until.date() if until else None, batch_size=batch_size
+    )
+    click.echo(f"Materialised {created} recurring records")
+
+
+def init_recurring(app: Flask) -> None:
+    """Register the recurring materialisation CLI command on *app*."""
+
+    app.cli.add_command(materialize_recurring_command)
@@ -0,0 +1,213 @@
+"""Full-text search over finance record categories and descriptions."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Final
+
+from flask import Flask, current_app
+from sqlalchemy import Select, column, func, or_, select, table, text
+from sqlalchemy.exc import OperationalError
+
+from . import db
+from .models import FinanceRecord
+
+FTS_TABLE: Final[str] = "finance_records_fts"
+# The trigram tokenizer matches substrings, which also covers Thai text that
+# has no spaces between words. It cannot match terms shorter than three
+# characters, so those queries use the LIKE fallback instead.
+_MIN_TRIGRAM_TERM: Final[int] = 3
+MAX_PER_PAGE: Final[int] = 100
+# Counting stops here so broad queries never count every matching row.
+MAX_COUNTED_RESULTS: Final[int] = 1000
+# bm25 ranking scores every global match, so terms matching more rows than
+# this across all users are listed newest-first instead.
+MAX_RANKED_MATCHES: Final[int] = 5000
+
+_FTS_TABLE_DDL: Final[str] = f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        category, description,
+        content='finance_records', content_rowid='id', tokenize='trigram'
+    )
+"""
+_FTS_TRIGGERS: Final[tuple[str, ...]] = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS finance_records_fts_insert
+    AFTER INSERT ON finance_records BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, category, description)
+        VALUES (new.id, new.category, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS finance_records_fts_delete
+    AFTER DELETE ON finance_records BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, category, description)
+        VALUES ('delete', old.id, old.category, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS finance_records_fts_update
+    AFTER UPDATE OF category, description ON finance_records BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, category, description)
+        VALUES ('delete', old.id, old.category, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, category, description)
+        VALUES (new.id, new.category, new.description);
+    END
+    """,
+)
+
+_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    """One page of search results plus pagination metadata."""
+
+    records: list[FinanceRecord]
+    total: int
+    page: int
+    per_page: int
+    total_capped: bool = False
+
+    @property
+    def pages(self) -> int:
+        """Return the number of pages needed for *total* results.
+
+        When *total_capped* is set only the counted pages are reported.
+        """
+
+        return max(1, -(-self.total // self.per_page))
+
+
+def init_search(app: Flask) -> None:
+    """Create the FTS5 index and its sync triggers when SQLite supports it."""
+
+    app.extensions["fts_enabled"] = False
+    if db.engine.dialect.name != "sqlite":
+        return
+
+    with db.engine.begin() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        ).first()
+        try:
+            if not exists:
+                connection.execute(text(_FTS_TABLE_DDL))
+                connection.execute(
+                    text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+                )
+            for statement in _FTS_TRIGGERS:
+                connection.execute(text(statement))
+        except OperationalError:
+            app.logger.warning("SQLite FTS5 is unavailable; search falls back to LIKE")
+            return
+
+    app.extensions["fts_enabled"] = True
+
+
+def _split_terms(query: str) -> list[str]:
+    """Split the user's *query* into whitespace separated terms."""
+
+    return [term for term in query.split() if term]
+
+
+def _fts_match_expression(terms: list[str]) -> str:
+    """Quote each term so FTS5 syntax characters are matched literally."""
+
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def _like_pattern(term: str) -> str:
+    """Return a ``LIKE`` pattern matching *term* anywhere in a column."""
+
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_records(
+    user_id: int,
+    query: str = "",
+    *,
+    record_type: str | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    page: int = 1,
+    per_page: int = 20,
+) -> SearchPage:
+    """Return ranked records for *user_id* matching *query* and the filters."""
+
+    page = max(1, page)
+    per_page = min(max(1, per_page), MAX_PER_PAGE)
+    terms = _split_terms(query)
+
+    conditions = [FinanceRecord.user_id == user_id]
+    if record_type:
+        conditions.append(FinanceRecord.record_type == record_type)
+    if start_date:
+        conditions.append(FinanceRecord.record_date >= start_date)
+    if end_date:
+        conditions.append(FinanceRecord.record_date <= end_date)
+
+    stmt: Select = select(FinanceRecord)
+    count_stmt: Select = select(FinanceRecord.id)
+    ordering = [FinanceRecord.record_date.desc(), FinanceRecord.id.desc()]
+
+    use_fts = (
+        terms
+        and current_app.extensions.get("fts_enabled")
+        and all(len(term) >= _MIN_TRIGRAM_TERM for term in terms)
+    )
+    if use_fts:
+        match = text(f"{FTS_TABLE} MATCH :match").bindparams(
+            match=_fts_match_expression(terms)
+        )
+        matches = select(_fts.c.rowid).where(match)
+        global_matches = db.session.execute(
+            select(func.count()).select_from(
+                matches.limit(MAX_RANKED_MATCHES + 1).subquery()
+            )
+        ).scalar_one()
+        if global_matches <= MAX_RANKED_MATCHES:
+            # The LIMIT keeps SQLite from flattening the subquery, so the few
+            # FTS matches drive the join instead of every row of the user.
+            ranked = (
+                select(_fts.c.rowid, _fts.c.rank)
+                .where(match)
+                .limit(MAX_RANKED_MATCHES + 1)
+                .subquery()
+            )
+            stmt = stmt.join(ranked, ranked.c.rowid == FinanceRecord.id)
+            count_stmt = count_stmt.join(ranked, ranked.c.rowid == FinanceRecord.id)
+            ordering.insert(0, ranked.c.rank)
+        else:
+            conditions.append(FinanceRecord.id.in_(matches))
+    else:
+        for term in terms:
+            pattern = _like_pattern(term)
+            conditions.append(
+                or_(
+                    FinanceRecord.category.ilike(pattern, escape="\\"),
+                    FinanceRecord.description.ilike(pattern, escape="\\"),
+                )
+            )
+
+    stmt = stmt.where(*conditions).order_by(*ordering)
+    count_stmt = count_stmt.where(*conditions)
+
+    counted = db.session.execute(
+        select(func.count()).select_from(
+            count_stmt.limit(MAX_COUNTED_RESULTS + 1).subquery()
+        )
+    ).scalar_one()
+    records = list(
+        db.session.scalars(stmt.limit(per_page).offset((page - 1) * per_page))
+    )
+    return SearchPage(
+        records=records,
+        total=min(counted, MAX_COUNTED_RESULTS),
+        page=page,
+        per_page=per_page,
+        total_capped=counted > MAX_COUNTED_RESULTS,
+    )
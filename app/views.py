@@ -8,8 +8,11 @@ from io import BytesIO
 
 from flask import (
     Blueprint,
+    abort,
     current_app,
     flash,
+    jsonify,
+    make_response,
     redirect,
     render_template,
     request,
@@ -17,12 +20,20 @@ from flask import (
     url_for,
 )
 from flask_login import current_user, login_required
+from markupsafe import Markup
 from openpyxl import Workbook
 from sqlalchemy import func, select
 from sqlalchemy.exc import SQLAlchemyError
 
 from . import db
-from .models import FinanceRecord
+from .models import FinanceRecord, RecurringRule
+from .recurring import (
+    FREQUENCIES,
+    MAX_INTERVAL,
+    first_occurrence,
+    materialize_due_records,
+)
+from .search import search_records
 
 
 views_bp = Blueprint("views", __name__)
@@ -47,6 +58,31 @@ def _load_user_records(user_id: int, *, ascending: bool) -> list[FinanceRecord]:
     return list(db.session.scalars(stmt))
 
 
+def _render_record_rows(user_id: int) -> Markup:
+    """Return the dashboard table rows for *user_id*, reusing cached HTML.
+
+    Records are only ever appended, so the highest record id together with the
+    row count identifies the rendered fragment without loading any rows. The
+    version query is answered from the ``ix_finance_records_user_date``
+    covering index, so it reads only this user's index entries.
+    """
+
+    version_stmt = select(
+        func.max(FinanceRecord.id), func.count(FinanceRecord.id)
+    ).where(FinanceRecord.user_id == user_id)
+    version = tuple(db.session.execute(version_stmt).one())
+
+    fragment_cache = current_app.extensions["fragment_cache"]
+    cached = fragment_cache.get(user_id, version)
+    if cached is not None:
+        return cached
+
+    records = _load_user_records(user_id, ascending=False)
+    fragment = Markup(render_template("_record_rows.html", records=records))
+    fragment_cache.set(user_id, version, fragment)
+    return fragment
+
+
 def _calculate_totals(user_id: int) -> tuple[Decimal, Decimal, Decimal]:
     """Return total income, expense, and balance for a user."""
 
@@ -96,6 +132,81 @@ def _parse_amount(raw_amount: str) -> tuple[Decimal | None, str | None, str | No
     return amount, None, None
 
 
+def _parse_search_filters() -> tuple[dict[str, object] | None, str | None]:
+    """Parse search query-string arguments into ``search_records`` options."""
+
+    record_type = request.args.get("record_type", "").strip() or None
+    if record_type and record_type not in _VALID_RECORD_TYPES:
+        return None, "กรุณาเลือกประเภทให้ถูกต้อง"
+
+    dates: dict[str, date | None] = {}
+    for name in ("start_date", "end_date"):
+        raw_value = request.args.get(name, "").strip()
+        dates[name] = _parse_record_date(raw_value) if raw_value else None
+        if raw_value and dates[name] is None:
+            return None, "รูปแบบวันที่ไม่ถูกต้อง"
+
+    return {
+        "query": request.args.get("q", "").strip(),
+        "record_type": record_type,
+        "page": request.args.get("page", 1, type=int),
+        "per_page": request.args.get("per_page", 20, type=int),
+        **dates,
+    }, None
+
+
+def _parse_recurring_form() -> tuple[dict[str, object] | None, str | None, str]:
+    """Validate the recurring rule form and return the rule's column values."""
+
+    record_type = request.form.get("record_type", "").strip()
+    frequency = request.form.get("frequency", "").strip()
+    category = request.form.get("category", "").strip()
+    description = request.form.get("description", "").strip() or None
+    amount_raw = request.form.get("amount", "").strip()
+    start_raw = request.form.get("start_date", "").strip()
+    end_raw = request.form.get("end_date", "").strip()
+    interval = request.form.get("interval", 1, type=int)
+    day_raw = request.form.get("day_of_month", "").strip()
+
+    if record_type not in _VALID_RECORD_TYPES:
+        return None, "กรุณาเลือกประเภทให้ถูกต้อง", "warning"
+    if frequency not in FREQUENCIES:
+        return None, "กรุณาเลือกความถี่ให้ถูกต้อง", "warning"
+    if not start_raw or not category or not amount_raw:
+        return None, "กรุณากรอกข้อมูลให้ครบถ้วน", "warning"
+    if interval is None or not 1 <= interval <= MAX_INTERVAL:
+        return None, f"รอบการทำซ้ำต้องเป็นจำนวนเต็มระหว่าง 1 ถึง {MAX_INTERVAL}", "warning"
+    if day_raw and (not day_raw.isdigit() or not 1 <= int(day_raw) <= 31):
+        return None, "วันที่ของเดือนต้องอยู่ระหว่าง 1 ถึง 31", "warning"
+
+    amount, amount_error, flash_category = _parse_amount(amount_raw)
+    if amount_error:
+        return None, amount_error, flash_category or "danger"
+
+    start_date = _parse_record_date(start_raw)
+    end_date = _parse_record_date(end_raw) if end_raw else None
+    if not start_date or (end_raw and not end_date):
+        return None, "รูปแบบวันที่ไม่ถูกต้อง", "danger"
+    if end_date and end_date < start_date:
+        return None, "วันที่สิ้นสุดต้องไม่ก่อนวันที่เริ่มต้น", "warning"
+
+    day_of_month = None
+    if frequency == "monthly":
+        day_of_month = int(day_raw) if day_raw else start_date.day
+    return {
+        "record_type": record_type,
+        "category": category,
+        "description": description,
+        "amount": amount,
+        "frequency": frequency,
+        "interval": interval,
+        "day_of_month": day_of_month,
+        "start_date": start_date,
+        "end_date": end_date,
+        "next_occurrence": first_occurrence(start_date, frequency, day_of_month),
+    }, None, ""
+
+
 @views_bp.route("/", methods=["GET", "POST"])
 @login_required
 def dashboard():
@@ -144,16 +255,23 @@ def dashboard():
                         flash("บันทึกข้อมูลเรียบร้อย", "success")
                         return redirect(url_for("views.dashboard"))
 
-    records = _load_user_records(current_user.id, ascending=False)
+    record_rows = _render_record_rows(current_user.id)
     income_total, expense_total, balance_total = _calculate_totals(current_user.id)
 
-    return render_template(
-        "dashboard.html",
-        records=records,
-        income_total=income_total,
-        expense_total=expense_total,
-        balance_total=balance_total,
+    response = make_response(
+        render_template(
+            "dashboard.html",
+            record_rows=record_rows,
+            income_total=income_total,
+            expense_total=expense_total,
+            balance_total=balance_total,
+        )
     )
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    # Weak validator: the body is byte-identical only before compression.
+    response.add_etag(weak=True)
+    return response.make_conditional(request)
 
 
 @views_bp.route("/download", methods=["GET"])
@@ -216,3 +334,115 @@ def download_excel():
         mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
 
+
+@views_bp.route("/search", methods=["GET"])
+@login_required
+def search():
+    """Search the user's records by category and description."""
+
+    filters, error = _parse_search_filters()
+    results = None
+    if error:
+        flash(error, "warning")
+    else:
+        results = search_records(current_user.id, **filters)
+
+    return render_template("search.html", results=results)
+
+
+@views_bp.route("/api/search", methods=["GET"])
+@login_required
+def search_api():
+    """Return ranked, paginated search results as JSON."""
+
+    filters, error = _parse_search_filters()
+    if error:
+        return jsonify({"error": error}), 400
+
+    results = search_records(current_user.id, **filters)
+    return jsonify(
+        {
+            "query": filters["query"],
+            "page": results.page,
+            "per_page": results.per_page,
+            "pages": results.pages,
+            "total": results.total,
+            "total_capped": results.total_capped,
+            "results": [
+                {
+                    "id": record.id,
+                    "record_date": record.record_date.isoformat(),
+                    "record_type": record.record_type,
+                    "category": record.category,
+                    "description": record.description,
+                    "amount": str(record.amount),
+                }
+                for record in results.records
+            ],
+        }
+    )
+
+
+@views_bp.route("/recurring", methods=["GET", "POST"])
+@login_required
+def recurring_rules():
+    """List and create the user's recurring transaction rules."""
+
+    if request.method == "POST":
+        fields, error, flash_category = _parse_recurring_form()
+        if error:
+            flash(error, flash_category)
+        else:
+            rule = RecurringRule(user_id=current_user.id, **fields)
+            try:
+                db.session.add(rule)
+                db.session.commit()
+            except SQLAlchemyError:
+                db.session.rollback()
+                current_app.logger.exception("Failed to save recurring rule")
+                flash("เกิดข้อผิดพลาดในการบันทึกข้อมูล โปรดลองใหม่อีกครั้ง", "danger")
+            else:
+                try:
+                    created = materialize_due_records(user_id=current_user.id)
+                except SQLAlchemyError:
+                    current_app.logger.exception("Failed to materialise recurring records")
+                    flash(
+                        "บันทึกรายการประจำแล้ว แต่ยังสร้างรายการย้อนหลังไม่สำเร็จ "
+                        "ระบบจะลองใหม่โดยอัตโนมัติ",
+                        "warning",
+                    )
+                else:
+                    flash(
+                        f"บันทึกรายการประจำเรียบร้อย (สร้างรายการย้อนหลัง {created} รายการ)",
+                        "success",
+                    )
+                return redirect(url_for("views.recurring_rules"))
+
+    stmt = (
+        select(RecurringRule)
+        .where(RecurringRule.user_id == current_user.id)
+        .order_by(RecurringRule.id.asc())
+    )
+    rules = list(db.session.scalars(stmt))
+    return render_template("recurring.html", rules=rules, max_interval=MAX_INTERVAL)
+
+
+@views_bp.route("/recurring/<int:rule_id>/delete", methods=["POST"])
+@login_required
+def delete_recurring_rule(rule_id: int):
+    """Stop a recurring rule; records it already created are kept."""
+
+    rule = db.session.get(RecurringRule, rule_id)
+    if rule is None or rule.user_id != current_user.id:
+        abort(404)
+
+    try:
+        db.session.delete(rule)
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        current_app.logger.exception("Failed to delete recurring rule")
+        flash("เกิดข้อผิดพลาดในการลบข้อมูล โปรดลองใหม่อีกครั้ง", "danger")
+    else:
+        flash("ลบรายการประจำเรียบร้อย", "info")
+    return redirect(url_for("views.recurring_rules"))
@@ -0,0 +1,423 @@
+"""Local load-test harness that drives concurrent simulated users at the app."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, timedelta
+from http.cookiejar import CookieJar
+from pathlib import Path
+from typing import Final
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urlsplit
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, build_opener
+
+from flask import Flask, has_request_context, request
+from flask.logging import default_handler
+from sqlalchemy.exc import OperationalError
+from werkzeug.serving import make_server
+
+from app import create_app, db
+
+DEFAULT_HOST: Final[str] = "127.0.0.1"
+REQUEST_TIMEOUT: Final[float] = 30.0
+PASSWORD: Final[str] = "LoadTest123!"
+SEARCH_TERMS: Final[tuple[str, ...]] = ("grab", "ค่าเดินทาง", "อาหาร", "เงินเดือน")
+CATEGORIES: Final[tuple[str, ...]] = ("ค่าเดินทาง", "อาหาร", "เงินเดือน", "ค่าเช่า")
+
+# Scenario tasks and their relative weights, in the style of locust tasks.
+TASK_WEIGHTS: Final[dict[str, int]] = {
+    "view_dashboard": 5,
+    "add_record": 3,
+    "search": 2,
+    "download": 1,
+}
+
+Sample = tuple[str, float, int, str | None]
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    """Surface redirects as responses so each request is timed on its own."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        """Never follow redirects; the 3xx response is returned as an error."""
+
+        return None
+
+
+class SimulatedUser:
+    """HTTP client with its own cookie jar that records timed samples."""
+
+    def __init__(self, base_url: str, username: str, rng: random.Random) -> None:
+        self.base_url = base_url
+        self.username = username
+        self.rng = rng
+        self.samples: list[Sample] = []
+        self._opener = build_opener(HTTPCookieProcessor(CookieJar()), _NoRedirect())
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        data: dict[str, str] | None = None,
+        *,
+        redirect_to: str | None = None,
+        **query: str,
+    ) -> None:
+        """Send one request and record its latency, status, and error.
+
+        A 3xx response counts as an error unless it points at *redirect_to*,
+        so a lost session bouncing to the login page is never timed as a
+        healthy request.
+        """
+
+        url = f"{self.base_url}{path}"
+        if query:
+            url = f"{url}?{urlencode(query)}"
+        body = urlencode(data).encode("utf-8") if data is not None else None
+        name = f"{method} {path}"
+
+        started = time.perf_counter()
+        status, error = 0, None
+        try:
+            with self._opener.open(url, data=body, timeout=REQUEST_TIMEOUT) as response:
+                response.read()
+                status = response.status
+        except HTTPError as exc:
+            exc.read()
+            status = exc.code
+            if status >= 400:
+                error = f"HTTP {status}"
+            elif urlsplit(exc.headers.get("Location", "")).path != redirect_to:
+                error = f"unexpected redirect {status}"
+        except (URLError, OSError) as exc:
+            error = type(exc).__name__
+        self.samples.append((name, time.perf_counter() - started, status, error))
+
+    def register_and_login(self) -> None:
+        """Create the account and open a session."""
+
+        self.request(
+            "POST",
+            "/auth/register",
+            {"username": self.username, "password": PASSWORD, "confirm_password": PASSWORD},
+            redirect_to="/auth/login",
+        )
+        self.request(
+            "POST",
+            "/auth/login",
+            {"username": self.username, "password": PASSWORD},
+            redirect_to="/",
+        )
+
+    def view_dashboard(self) -> None:
+        """Load the dashboard page."""
+
+        self.request("GET", "/")
+
+    def add_record(self) -> None:
+        """Submit a random record through the dashboard form."""
+
+        record_date = date.today() - timedelta(days=self.rng.randrange(365))
+        self.request(
+            "POST",
+            "/",
+            {
+                "record_date": record_date.isoformat(),
+                "record_type": self.rng.choice(("income", "expense")),
+                "category": self.rng.choice(CATEGORIES),
+                "description": f"grab {self.rng.randrange(1000)}",
+                "amount": f"{self.rng.uniform(1, 5000):.2f}",
+            },
+            redirect_to="/",
+        )
+
+    def search(self) -> None:
+        """Query the search API with a common term."""
+
+        self.request("GET", "/api/search", q=self.rng.choice(SEARCH_TERMS))
+
+    def download(self) -> None:
+        """Download the Excel export."""
+
+        self.request("GET", "/download")
+
+
+def run_user(base_url: str, user_index: int, iterations: int, seed: int) -> list[Sample]:
+    """Run one simulated user's scenario and return its samples."""
+
+    rng = random.Random(seed + user_index)
+    user = SimulatedUser(base_url, f"load-{seed}-{user_index}", rng)
+    user.register_and_login()
+
+    tasks = list(TASK_WEIGHTS)
+    weights = list(TASK_WEIGHTS.values())
+    for _ in range(iterations):
+        getattr(user, rng.choices(tasks, weights)[0])()
+    return user.samples
+
+
+class _ServerMetrics(logging.Handler):
+    """Collect SQLite lock errors and heap usage per endpoint on the server."""
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.ERROR)
+        self.lock_errors: dict[str, int] = defaultdict(int)
+        self.heap_peak: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Count logged exceptions caused by a locked SQLite database."""
+
+        exc = record.exc_info[1] if record.exc_info else None
+        if isinstance(exc, OperationalError) and "locked" in str(exc):
+            with self._lock:
+                self.lock_errors[_endpoint_name()] += 1
+
+    def record_heap(self, response):
+        """Track the traced heap size seen when each endpoint finishes."""
+
+        if not tracemalloc.is_tracing():
+            return response
+        current, _ = tracemalloc.get_traced_memory()
+        name = _endpoint_name()
+        with self._lock:
+            self.heap_peak[name] = max(self.heap_peak[name], current)
+        return response
+
+
+def _endpoint_name() -> str:
+    """Return the ``METHOD /path`` label for the active request."""
+
+    if not has_request_context():
+        return "-"
+    return f"{request.method} {request.path}"
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of *sorted_values*."""
+
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _peak_rss_mib() -> float | None:
+    """Return the process peak resident set size in MiB where available."""
+
+    try:
+        import resource
+    except ModuleNotFoundError:  # pragma: no cover - not available on Windows
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _build_app(database: Path, overrides: dict[str, object], metrics: _ServerMetrics) -> Flask:
+    """Create the app under test with *overrides* and metric hooks attached."""
+
+    config: dict[str, object] = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{database.resolve().as_posix()}",
+    }
+    config.update(overrides)
+    app = create_app(config)
+    app.logger.removeHandler(default_handler)
+    app.logger.addHandler(metrics)
+    app.after_request(metrics.record_heap)
+    return app
+
+
+def run_load_test(
+    *,
+    users: int = 20,
+    iterations: int = 10,
+    pool: str = "thread",
+    workers: int | None = None,
+    seed: int = 0,
+    database: Path | None = None,
+    overrides: dict[str, object] | None = None,
+    trace_memory: bool = True,
+) -> dict[str, object]:
+    """Serve the app locally, run concurrent users against it and report.
+
+    Heap figures come from ``tracemalloc`` in the server process, sampled at
+    the end of each request, so they are process-wide rather than isolated
+    per endpoint. Tracing slows the server; pass ``trace_memory=False`` when
+    comparing latency alone.
+    """
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    if trace_memory:
+        tracemalloc.start()
+    metrics = _ServerMetrics()
+
+    with tempfile.TemporaryDirectory(prefix="finance-loadtest-") as tmp_dir:
+        app = _build_app(database or Path(tmp_dir) / "finance.db", overrides or {}, metrics)
+        server = make_server(DEFAULT_HOST, 0, app, threaded=True)
+        base_url = f"http://{DEFAULT_HOST}:{server.server_port}"
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+
+        executor_cls = ProcessPoolExecutor if pool == "process" else ThreadPoolExecutor
+        started = time.perf_counter()
+        try:
+            with executor_cls(max_workers=workers or users) as executor:
+                futures = [
+                    executor.submit(run_user, base_url, index, iterations, seed)
+                    for index in range(users)
+                ]
+                samples = [sample for future in futures for sample in future.result()]
+        finally:
+            elapsed = time.perf_counter() - started
+            server.shutdown()
+            server_thread.join()
+            with app.app_context():
+                db.engine.dispose()
+
+    heap_peak = None
+    if trace_memory:
+        _, heap_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    grouped: dict[str, list[Sample]] = defaultdict(list)
+    for sample in samples:
+        grouped[sample[0]].append(sample)
+
+    endpoints = {}
+    for name, endpoint_samples in sorted(grouped.items()):
+        latencies = sorted(sample[1] * 1000 for sample in endpoint_samples)
+        endpoints[name] = {
+            "requests": len(endpoint_samples),
+            "errors": sum(1 for sample in endpoint_samples if sample[3]),
+            "statuses": dict(
+                sorted(Counter(str(sample[2]) for sample in endpoint_samples).items())
+            ),
+            "lock_errors": metrics.lock_errors.get(name, 0),
+            "throughput_rps": len(endpoint_samples) / elapsed if elapsed else 0.0,
+            "p50_ms": _percentile(latencies, 0.50),
+            "p90_ms": _percentile(latencies, 0.90),
+            "p99_ms": _percentile(latencies, 0.99),
+            "max_ms": latencies[-1],
+            "heap_max_mib": (
+                metrics.heap_peak.get(name, 0) / (1024 * 1024) if trace_memory else None
+            ),
+        }
+
+    return {
+        "users": users,
+        "iterations": iterations,
+        "pool": pool,
+        "seed": seed,
+        "overrides": overrides or {},
+        "elapsed_s": elapsed,
+        "requests": len(samples),
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "lock_errors": sum(metrics.lock_errors.values()),
+        "heap_peak_mib": heap_peak / (1024 * 1024) if heap_peak is not None else None,
+        "rss_peak_mib": _peak_rss_mib(),
+        "endpoints": endpoints,
+    }
+
+
+def _mib(value: float | None) -> str:
+    """Format a MiB figure, or ``-`` when it was not measured."""
+
+    return "-" if value is None else f"{value:.1f}"
+
+
+def format_report(report: dict[str, object]) -> str:
+    """Render *report* as a fixed-width text table."""
+
+    header = (
+        f"{'endpoint':<22}{'reqs':>7}{'err':>6}{'locked':>8}{'req/s':>9}"
+        f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'heap MiB':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for name, stats in report["endpoints"].items():
+        lines.append(
+            f"{name:<22}{stats['requests']:>7}{stats['errors']:>6}{stats['lock_errors']:>8}"
+            f"{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>9.1f}{stats['p90_ms']:>9.1f}"
+            f"{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}{_mib(stats['heap_max_mib']):>10}"
+        )
+    lines.append("-" * len(header))
+    lines.append(
+        f"{report['requests']} requests in {report['elapsed_s']:.2f}s "
+        f"({report['throughput_rps']:.1f} req/s), {report['lock_errors']} SQLite lock errors, "
+        f"heap peak {_mib(report['heap_peak_mib'])} MiB, RSS peak {_mib(report['rss_peak_mib'])} MiB"
+    )
+    return "\n".join(lines)
+
+
+def _parse_override(raw: str) -> tuple[str, object]:
+    """Parse a ``KEY=VALUE`` option, decoding VALUE as JSON when possible."""
+
+    key, separator, value = raw.partition("=")
+    if not separator or not key:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got {raw!r}")
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Parse command-line options, run the load test and print the report."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20, help="simulated users")
+    parser.add_argument("--iterations", type=int, default=10, help="tasks per user")
+    parser.add_argument("--pool", choices=("thread", "process"), default="thread")
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: users)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for scenarios")
+    parser.add_argument(
+        "--database", type=Path, default=None, help="SQLite file (default: fresh temp file)"
+    )
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        type=_parse_override,
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="app config override, VALUE parsed as JSON when valid",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="sample heap usage with tracemalloc (slows the server)",
+    )
+    parser.add_argument("--json", type=Path, default=None, help="also write the report here")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(
+        users=args.users,
+        iterations=args.iterations,
+        pool=args.pool,
+        workers=args.workers,
+        seed=args.seed,
+        database=args.database,
+        overrides=dict(args.overrides),
+        trace_memory=args.trace_memory,
+    )
+    print(format_report(report))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(1)
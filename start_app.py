@@ -12,6 +12,7 @@ from contextlib import closing
 from typing import Final
 
 from app import create_app
+from app.recurring import RecurringScheduler
 
 DEFAULT_HOST: Final[str] = "127.0.0.1"
 DEFAULT_PORT: Final[int] = 5000
@@ -67,6 +68,8 @@ def main() -> None:
         )
 
     app = create_app()
+    scheduler = RecurringScheduler(app, interval=app.config["RECURRING_INTERVAL"])
+    scheduler.start()
 
     url = f"http://{host}:{port}/"
     threading.Timer(BROWSER_OPEN_DELAY, _open_browser, args=(url,)).start()
@@ -75,7 +78,10 @@ def main() -> None:
     print(f"เปิดเบราว์เซอร์ที่ {url}")
     print("กด Ctrl+C เพื่อปิดแอปพลิเคชันเมื่อใช้งานเสร็จ")
 
-    app.run(host=host, port=port, debug=False)
+    try:
+        app.run(host=host, port=port, debug=False)
+    finally:
+        scheduler.stop()
 
 
 if __name__ == "__main__":
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import gzip
+import re
 from datetime import date
+from decimal import Decimal
 from io import BytesIO
 
 import pytest
 from openpyxl import load_workbook
+from sqlalchemy.exc import SQLAlchemyError
 
 from app import db
-from app.models import FinanceRecord
+from app.models import FinanceRecord, RecurringRule, User
+from app.recurring import RecurringScheduler, materialize_due_records
 
 
 def register(client, username: str = "tester", password: str = "Secret123!"):
@@ -106,3 +111,343 @@ def test_negative_amount_is_rejected(client, app):
 
     with app.app_context():
         assert db.session.execute(db.select(FinanceRecord.id)).first() is None
+
+
+def test_dashboard_is_conditional_and_compressed(client):
+    register(client)
+    login(client)
+    add_record(client)
+
+    first = client.get("/")
+    etag = first.headers["ETag"]
+    assert etag.startswith("W/")
+    assert "no-cache" in first.headers["Cache-Control"]
+
+    not_modified = client.get("/", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+
+    compressed = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert "1,200.50" in gzip.decompress(compressed.data).decode("utf-8")
+
+    identity = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in identity.headers
+    assert "Accept-Encoding" in identity.headers["Vary"]
+
+
+def test_record_rows_fragment_tracks_new_records(client, app):
+    register(client)
+    login(client)
+    add_record(client)
+    client.get("/")
+
+    fragment_cache = app.extensions["fragment_cache"]
+    cached = fragment_cache.get(1, (1, 1))
+    assert cached is not None and "1,200.50" in cached
+
+    add_record(client, category="ค่าเดินทาง", record_type="expense", amount="75")
+    page_text = client.get("/").get_data(as_text=True)
+    assert "ค่าเดินทาง" in page_text
+    assert fragment_cache.get(1, (1, 1)) is None
+
+
+def test_static_assets_are_fingerprinted(client):
+    page = client.get("/auth/login").get_data(as_text=True)
+    match = re.search(r'href="(/static/styles\.css\?v=[0-9a-f]+)"', page)
+    assert match
+
+    asset = client.get(match.group(1))
+    assert asset.status_code == 200
+    assert "immutable" in asset.headers["Cache-Control"]
+    assert "no-cache" not in asset.headers["Cache-Control"]
+    assert "max-age=31536000" in asset.headers["Cache-Control"]
+    asset.close()
+
+
+def test_search_ranks_filters_and_paginates(client, app):
+    register(client)
+    login(client)
+    add_record(
+        client,
+        record_date="2023-03-01",
+        category="ค่าเดินทาง",
+        description="Grab ride",
+        record_type="expense",
+        amount="120",
+    )
+    add_record(
+        client,
+        record_date="2023-07-15",
+        category="ค่าเดินทาง",
+        description="grab to airport",
+        record_type="expense",
+        amount="350",
+    )
+    add_record(
+        client,
+        record_date="2024-01-10",
+        category="ค่าเดินทาง",
+        description="GRAB home",
+        record_type="expense",
+        amount="90",
+    )
+    add_record(
+        client,
+        record_date="2023-05-05",
+        category="อาหาร",
+        description="ข้าวมันไก่",
+        record_type="expense",
+        amount="50",
+    )
+
+    assert app.extensions["fts_enabled"]
+
+    last_year = {"q": "grab", "start_date": "2023-01-01", "end_date": "2023-12-31"}
+
+    response = client.get(
+        "/api/search",
+        query_string=dict(last_year, per_page=1),
+    )
+    payload = response.get_json()
+    assert response.status_code == 200
+    assert payload["total"] == 2
+    assert payload["pages"] == 2
+    assert len(payload["results"]) == 1
+
+    second_page = client.get(
+        "/api/search",
+        query_string=dict(last_year, per_page=1, page=2),
+    ).get_json()
+    found = {payload["results"][0]["description"], second_page["results"][0]["description"]}
+    assert found == {"Grab ride", "grab to airport"}
+
+    thai_payload = client.get("/api/search", query_string={"q": "เดินทาง"}).get_json()
+    assert thai_payload["total"] == 3
+
+    short_payload = client.get("/api/search", query_string={"q": "ไก"}).get_json()
+    assert short_payload["total"] == 1
+
+    page_text = client.get("/search", query_string={"q": "airport"}).get_data(as_text=True)
+    assert "grab to airport" in page_text
+    assert "ข้าวมันไก่" not in page_text
+
+
+def test_search_is_scoped_to_current_user(client):
+    register(client)
+    login(client)
+    add_record(client, description="Grab ride")
+    client.get("/auth/logout")
+
+    register(client, username="other")
+    login(client, username="other")
+    payload = client.get("/api/search", query_string={"q": "grab"}).get_json()
+    assert payload["total"] == 0
+
+    bad_request = client.get("/api/search", query_string={"start_date": "not-a-date"})
+    assert bad_request.status_code == 400
+
+
+def test_recurring_rule_catches_up_idempotently(client, app):
+    register(client)
+    login(client)
+
+    response = client.post(
+        "/recurring",
+        data={
+            "start_date": "2024-01-31",
+            "end_date": "2024-05-15",
+            "frequency": "monthly",
+            "interval": "1",
+            "record_type": "expense",
+            "category": "ค่าเช่า",
+            "amount": "8000",
+        },
+        follow_redirects=True,
+    )
+    assert "สร้างรายการย้อนหลัง 4 รายการ" in response.get_data(as_text=True)
+
+    record_dates = db.session.scalars(
+        db.select(FinanceRecord.record_date).order_by(FinanceRecord.record_date)
+    ).all()
+    assert record_dates == [
+        date(2024, 1, 31),
+        date(2024, 2, 29),
+        date(2024, 3, 31),
+        date(2024, 4, 30),
+    ]
+
+    rule = db.session.scalars(db.select(RecurringRule)).one()
+    assert rule.next_occurrence is None
+    assert materialize_due_records() == 0
+
+
+def test_recurring_cli_materialises_weekly_rules(app):
+    user = User(username="cron", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(
+        RecurringRule(
+            user_id=user.id,
+            record_type="expense",
+            category="สมาชิกรายสัปดาห์",
+            amount=Decimal("99.00"),
+            frequency="weekly",
+            interval=2,
+            start_date=date(2024, 1, 1),
+            next_occurrence=date(2024, 1, 1),
+        )
+    )
+    db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["materialize-recurring", "--until", "2024-02-01"])
+    assert "Materialised 3 recurring records" in result.output
+
+    result = runner.invoke(args=["materialize-recurring", "--until", "2024-02-01"])
+    assert "Materialised 0 recurring records" in result.output
+
+    rule = db.session.scalars(db.select(RecurringRule)).one()
+    assert rule.next_occurrence == date(2024, 2, 12)
+
+
+def test_recurring_rule_day_of_month_and_delete(client, monkeypatch):
+    register(client)
+    login(client)
+
+    def failing_materialize(**kwargs):
+        raise SQLAlchemyError("boom")
+
+    monkeypatch.setattr("app.views.materialize_due_records", failing_materialize)
+    response = client.post(
+        "/recurring",
+        data={
+            "start_date": "2024-01-20",
+            "day_of_month": "5",
+            "frequency": "monthly",
+            "interval": "1",
+            "record_type": "income",
+            "category": "เงินเดือน",
+            "amount": "30000",
+        },
+        follow_redirects=True,
+    )
+    assert "ยังสร้างรายการย้อนหลังไม่สำเร็จ" in response.get_data(as_text=True)
+
+    rule = db.session.scalars(db.select(RecurringRule)).one()
+    assert rule.day_of_month == 5
+    assert rule.next_occurrence == date(2024, 2, 5)
+
+    response = client.post(f"/recurring/{rule.id}/delete", follow_redirects=True)
+    assert "ลบรายการประจำเรียบร้อย" in response.get_data(as_text=True)
+    assert db.session.scalars(db.select(RecurringRule)).first() is None
+
+
+def test_recurring_interval_is_bounded_and_overflow_finishes_rule(client, app):
+    register(client)
+    login(client)
+
+    response = client.post(
+        "/recurring",
+        data={
+            "start_date": "2024-01-01",
+            "frequency": "monthly",
+            "interval": "1000000",
+            "record_type": "expense",
+            "category": "ค่าเช่า",
+            "amount": "100",
+        },
+        follow_redirects=True,
+    )
+    assert response.status_code == 200
+    assert "รอบการทำซ้ำต้องเป็นจำนวนเต็มระหว่าง 1 ถึง 120" in response.get_data(as_text=True)
+    assert db.session.scalars(db.select(RecurringRule)).first() is None
+
+    db.session.add(
+        RecurringRule(
+            user_id=1,
+            record_type="expense",
+            category="ค่าเช่า",
+            amount=Decimal("100.00"),
+            frequency="monthly",
+            interval=1_000_000,
+            day_of_month=1,
+            start_date=date(2024, 1, 1),
+            next_occurrence=date(2024, 1, 1),
+        )
+    )
+    db.session.commit()
+
+    assert materialize_due_records(until=date(2024, 6, 1)) == 1
+    rule = db.session.scalars(db.select(RecurringRule)).one()
+    assert rule.next_occurrence is None
+
+
+def test_recurring_scheduler_survives_unexpected_errors(app, monkeypatch):
+    calls = []
+
+    def flaky_materialize():
+        calls.append(None)
+        if len(calls) == 1:
+            raise ValueError("boom")
+        scheduler.stop()
+        return 0
+
+    monkeypatch.setattr("app.recurring.materialize_due_records", flaky_materialize)
+    scheduler = RecurringScheduler(app, interval=0.01)
+    scheduler.start()
+    scheduler.join(timeout=5)
+
+    assert not scheduler.is_alive()
+    assert len(calls) == 2
+
+
+def test_search_caps_counts_and_lists_broad_terms_newest_first(client, monkeypatch):
+    register(client)
+    login(client)
+    for month in (1, 3, 2):
+        add_record(
+            client,
+            record_date=f"2023-0{month}-01",
+            category="ค่าเดินทาง",
+            description="Grab ride",
+            record_type="expense",
+            amount="100",
+        )
+
+    monkeypatch.setattr("app.search.MAX_COUNTED_RESULTS", 2)
+    monkeypatch.setattr("app.search.MAX_RANKED_MATCHES", 1)
+    payload = client.get("/api/search", query_string={"q": "grab"}).get_json()
+
+    assert payload["total"] == 2
+    assert payload["total_capped"] is True
+    assert [row["record_date"] for row in payload["results"]] == [
+        "2023-03-01",
+        "2023-02-01",
+        "2023-01-01",
+    ]
+
+
+def test_finance_record_index_serves_user_queries(app):
+    plan = db.session.execute(
+        db.text(
+            "EXPLAIN QUERY PLAN SELECT id FROM finance_records "
+            "WHERE user_id = 1 ORDER BY record_date DESC, id DESC"
+        )
+    ).all()
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_finance_records_user_date" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_record_rows_version_check_uses_user_index(app):
+    plan = db.session.execute(
+        db.text(
+            "EXPLAIN QUERY PLAN SELECT max(id), count(id) FROM finance_records "
+            "WHERE user_id = 1"
+        )
+    ).all()
+    details = " ".join(row[-1] for row in plan)
+    assert "COVERING INDEX ix_finance_records_user_date (user_id=?)" in details
+    assert "SCAN finance_records" not in details
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import loadtest
+
+
+def test_load_test_reports_every_endpoint():
+    report = loadtest.run_load_test(users=2, iterations=6, seed=1)
+
+    endpoints = report["endpoints"]
+    assert "POST /auth/register" in endpoints
+    assert "POST /auth/login" in endpoints
+    assert report["requests"] == sum(stats["requests"] for stats in endpoints.values())
+    assert all(stats["errors"] == 0 for stats in endpoints.values())
+    for name, stats in endpoints.items():
+        if name.startswith("GET "):
+            assert stats["statuses"] == {"200": stats["requests"]}
+    assert report["lock_errors"] == 0
+    assert report["heap_peak_mib"] > 0
+
+    text = loadtest.format_report(report)
+    assert "p99 ms" in text
+    assert "SQLite lock errors" in text